@@ -1,6 +1,18 @@
 from manim import *
+import numpy as np
 import random
-import math
+from array import array
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:  # numba is optional: the kernels below then run as plain Python
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda f: f
 
 # Manim script: BFS vs Random Walk visualization
 # Designed for Manim Community (manim>=0.16)
@@ -10,10 +22,207 @@ GRID_SIZE = 12
 CELL_SIZE = 0.5
 WALL_PROB = 0.28
 SEED = 42
+QUEUE_SLOTS = 6  # most squares the queue box ever shows at once
+TRAIL_MAX_SEGMENTS = 400  # visible random-walk history; older segments are dropped
+
+# Neighbor masks are 4-bit ints: bit 0 = +x, bit 1 = -x, bit 2 = +y, bit 3 = -y
+_DX = (1, -1, 0, 0)
+_DY = (0, 0, 1, -1)
+_BIT_DIR = (-1, 0, 1, -1, 2, -1, -1, -1, 3)  # single-bit mask -> direction index
+_FORWARD = 1  # BFS side growing from start
+_BACKWARD = 2  # BFS side growing from goal
+_SEGMENT_ALPHAS = np.linspace(0, 1, 4)[:, None]  # anchors + handles of a straight cubic
+_CELL_FILLS = ((GREY_B, 1.0), (WHITE, 0.9))  # (color, opacity) indexed by maze value: wall, free
+
+
+@njit(cache=True)
+def _nmask(x, y, padded):
+    # padded carries a one-cell wall border, so every read is in bounds
+    return int(padded[y + 1, x + 2] | (padded[y + 1, x] << 1) | (padded[y + 2, x + 1] << 2) | (padded[y, x + 1] << 3))
+
+
+def _rect_points(centers, side):
+    # Closed squares around each center as straight cubic edges (4 edges x 4 points each).
+    # Adjacent cells do share edges; each square is still its own subpath only because its
+    # closing point (top-left corner) differs from the next square's first point, so keep
+    # that corner order when touching this.
+    h = side / 2
+    corners = np.array([[-h, h, 0], [h, h, 0], [h, -h, 0], [-h, -h, 0], [-h, h, 0]])
+    a = centers[:, None, :] + corners[None, :-1, :]
+    b = centers[:, None, :] + corners[None, 1:, :]
+    pts = a[:, :, None, :] + _SEGMENT_ALPHAS[None, None] * (b - a)[:, :, None, :]
+    return pts.reshape(-1, 3)
+
+
+@njit(cache=True)
+def _join_path(parent, f, b):
+    # start..f along forward parents, then b..goal along backward parents (b = -1: none)
+    nf = 0
+    cur = f
+    while cur >= 0:
+        cur = parent[cur]
+        nf += 1
+    nb = 0
+    cur = b
+    while cur >= 0:
+        cur = parent[cur]
+        nb += 1
+    path = np.empty(nf + nb, np.int32)
+    cur = f
+    for k in range(nf - 1, -1, -1):
+        path[k] = cur
+        cur = parent[cur]
+    cur = b
+    for k in range(nf, nf + nb):
+        path[k] = cur
+        cur = parent[cur]
+    return path
+
+
+@njit(cache=True)
+def _bfs_kernel(padded, sx, sy, gx, gy):
+    # Bidirectional layered BFS over a flat index space (idx = y * n + x). One frontier grows
+    # from start, one from goal; each step expands a whole layer of the smaller frontier and
+    # the search stops as soon as it reaches a cell already claimed by the other side.
+    # Returns layer_id[n*n] (-1 = never expanded), the side (_FORWARD/_BACKWARD) of every
+    # layer and the start->goal path as flat indices (empty if the goal is unreachable).
+    n = padded.shape[0] - 2
+    side = np.zeros(n * n, np.uint8)
+    parent = np.full(n * n, -1, np.int32)
+    layer_id = np.full(n * n, -1, np.int32)
+    layer_side = np.zeros(n * n, np.uint8)
+    # row 0 is the forward queue, row 1 the backward one
+    queue = np.empty((2, n * n), np.int32)
+    head = np.zeros(2, np.int64)
+    tail = np.ones(2, np.int64)
+    start = sy * n + sx
+    goal = gy * n + gx
+    queue[0, 0] = start
+    queue[1, 0] = goal
+    side[start] = _FORWARD
+    if goal == start:
+        layer_id[start] = 0
+        layer_side[0] = _FORWARD
+        return layer_id, layer_side[:1], _join_path(parent, start, -1)
+    side[goal] = _BACKWARD
+    layer = 0
+    while head[0] < tail[0] and head[1] < tail[1]:
+        q = 0 if tail[0] - head[0] <= tail[1] - head[1] else 1
+        own = _FORWARD if q == 0 else _BACKWARD
+        layer_side[layer] = own
+        end = tail[q]
+        while head[q] < end:
+            idx = queue[q, head[q]]
+            head[q] += 1
+            layer_id[idx] = layer
+            x = idx % n
+            y = idx // n
+            mask = _nmask(x, y, padded)
+            while mask:
+                b = mask & -mask
+                mask ^= b
+                d = _BIT_DIR[b]
+                nb = idx + _DX[d] + _DY[d] * n
+                if side[nb] == 0:
+                    side[nb] = own
+                    parent[nb] = idx
+                    queue[q, tail[q]] = nb
+                    tail[q] += 1
+                elif side[nb] != own:
+                    # frontiers met across the edge idx-nb
+                    if own == _FORWARD:
+                        return layer_id, layer_side[:layer + 1], _join_path(parent, idx, nb)
+                    return layer_id, layer_side[:layer + 1], _join_path(parent, nb, idx)
+        layer += 1
+    return layer_id, layer_side[:layer], np.empty(0, np.int32)
+
+
+def _bfs_flat(maze_flat, n, sx, sy, gx, gy):
+    # Pure-Python twin of _bfs_kernel for when numba is missing: numpy scalar indexing is
+    # slow in the interpreter, so this sticks to bytes/bytearray/array and flat int indices.
+    # Each side's queue is a preallocated array indexed by head/tail; every cell is enqueued
+    # at most once, so n*n slots always suffice.
+    # Returns the expanded (side, layer) pairs and the start->goal path, both as flat indices.
+    nn = n * n
+    side = bytearray(nn)
+    parent = array('i', [-1]) * nn
+    qbufs = (array('i', [0]) * nn, array('i', [0]) * nn)
+    heads = [0, 0]
+    tails = [1, 1]
+    start = sy * n + sx
+    goal = gy * n + gx
+    qbufs[0][0] = start
+    qbufs[1][0] = goal
+    side[start] = _FORWARD
+    if goal == start:
+        return [(_FORWARD, [start])], [start]
+    side[goal] = _BACKWARD
+    layers = []
+    while heads[0] < tails[0] and heads[1] < tails[1]:
+        q = 0 if tails[0] - heads[0] <= tails[1] - heads[1] else 1
+        own = _FORWARD if q == 0 else _BACKWARD
+        qbuf = qbufs[q]
+        head = heads[q]
+        tail = tails[q]
+        layer = []
+        layers.append((own, layer))
+        for _ in range(tail - head):
+            idx = qbuf[head]
+            head += 1
+            layer.append(idx)
+            x = idx % n
+            nb = idx + 1
+            if x + 1 < n and maze_flat[nb]:
+                if not side[nb]:
+                    side[nb] = own
+                    parent[nb] = idx
+                    qbuf[tail] = nb
+                    tail += 1
+                elif side[nb] != own:
+                    f, b = (idx, nb) if own == _FORWARD else (nb, idx)
+                    return layers, _join_path(parent, f, b).tolist()
+            nb = idx - 1
+            if x > 0 and maze_flat[nb]:
+                if not side[nb]:
+                    side[nb] = own
+                    parent[nb] = idx
+                    qbuf[tail] = nb
+                    tail += 1
+                elif side[nb] != own:
+                    f, b = (idx, nb) if own == _FORWARD else (nb, idx)
+                    return layers, _join_path(parent, f, b).tolist()
+            nb = idx + n
+            if idx + n < nn and maze_flat[nb]:
+                if not side[nb]:
+                    side[nb] = own
+                    parent[nb] = idx
+                    qbuf[tail] = nb
+                    tail += 1
+                elif side[nb] != own:
+                    f, b = (idx, nb) if own == _FORWARD else (nb, idx)
+                    return layers, _join_path(parent, f, b).tolist()
+            nb = idx - n
+            if idx >= n and maze_flat[nb]:
+                if not side[nb]:
+                    side[nb] = own
+                    parent[nb] = idx
+                    qbuf[tail] = nb
+                    tail += 1
+                elif side[nb] != own:
+                    f, b = (idx, nb) if own == _FORWARD else (nb, idx)
+                    return layers, _join_path(parent, f, b).tolist()
+        heads[q] = head
+        tails[q] = tail
+    return layers, []
+
 
 class BFSVsRandomWalkScene(Scene):
     def construct(self):
         random.seed(SEED)
+        # per-grid lookup caches, keyed by id() of the grid container
+        self._squares_cache = {}
+        self._centers_cache = {}
+        self._center_array_cache = {}
 
         # Create the maze as a 2D boolean grid: True = free, False = wall
         maze = self._generate_maze(GRID_SIZE, WALL_PROB, seed=SEED)
@@ -21,23 +230,25 @@ class BFSVsRandomWalkScene(Scene):
         goal = (GRID_SIZE - 1, GRID_SIZE - 1)
         maze[start[1]][start[0]] = True
         maze[goal[1]][goal[0]] = True
+        padded = np.zeros((GRID_SIZE + 2, GRID_SIZE + 2), np.uint8)
+        padded[1:-1, 1:-1] = maze
 
         # Build left and right grid VGroups (they share the same maze layout)
         left_grid = self._build_grid(maze, label="Random Walk")
-        right_grid = self._build_grid(maze, label="Breadth-First Search")
+        # same maze on both sides: copy the built grid instead of running n*n Square constructors again
+        right_grid = self._relabel_grid(left_grid.copy(), label="Breadth-First Search")
 
         # Position them side by side
         left_grid.shift(LEFT * (GRID_SIZE * CELL_SIZE / 1.5))
         right_grid.shift(RIGHT * (GRID_SIZE * CELL_SIZE / 1.5))
 
-        # Add both grids
-        self.add(left_grid, right_grid)
-
-        # Add start and goal markers
-        left_start_dot = self._place_marker(left_grid, start, color=GREEN)
-        left_goal_dot = self._place_marker(left_grid, goal, color=RED)
-        right_start_dot = self._place_marker(right_grid, start, color=GREEN)
-        right_goal_dot = self._place_marker(right_grid, goal, color=RED)
+        # Start and goal markers
+        left_centers = self._grid_centers(left_grid)
+        right_centers = self._grid_centers(right_grid)
+        left_start_dot = self._place_marker(left_grid, start, color=GREEN, centers=left_centers)
+        left_goal_dot = self._place_marker(left_grid, goal, color=RED, centers=left_centers)
+        right_start_dot = self._place_marker(right_grid, start, color=GREEN, centers=right_centers)
+        right_goal_dot = self._place_marker(right_grid, goal, color=RED, centers=right_centers)
 
         # Time counters
         rw_counter = Integer(0).scale(0.7)
@@ -46,17 +257,18 @@ class BFSVsRandomWalkScene(Scene):
         bfs_label = VGroup(Text("Time"), bfs_counter).arrange(RIGHT, buff=0.15)
         rw_label.to_edge(UL).shift(RIGHT * 0.5)
         bfs_label.to_edge(UR).shift(LEFT * 0.5)
-        self.add(rw_label, bfs_label)
 
         # Create random walker on left
-        left_center_points = self._grid_centers(left_grid)
-        rw_dot = Dot(left_center_points[start]).set_color(BLUE).scale(0.5)
-        rw_trail = VMobject().set_stroke(width=2, opacity=0.7).set_color(rgb_to_color([0.6,0.85,1]))
-        rw_trail.set_points_as_corners([left_center_points[start], left_center_points[start]])
-        self.add(rw_dot, rw_trail)
+        # (n, n, 3) array indexed [y, x], so the walker never hashes tuples
+        left_center_points = self._center_array(left_grid)
+        start_point = left_center_points[start[1], start[0]]
+        rw_dot = Dot(start_point).set_color(BLUE).scale(0.5)
+        # Trail is a capped group of short Lines; each one is never touched after creation
+        trail_color = rgb_to_color([0.6,0.85,1])
+        rw_trail = VGroup()
 
-        # BFS preprocessing (compute layers and parent pointers)
-        bfs_layers, parent = self._bfs_layers(maze, start, goal)
+        # BFS preprocessing (compute layers and the shortest path in one pass)
+        bfs_layers, path = self._bfs_layers(padded, start, goal)
 
         # Prepare visual layers for right grid (for fast lookup)
         right_squares = self._square_dict(right_grid)
@@ -65,18 +277,27 @@ class BFSVsRandomWalkScene(Scene):
         # Create queue visual (bottom-right corner)
         queue_box = self._build_queue_box().scale(0.9).to_corner(DR)
         queue_box.shift(LEFT * 0.4 + UP * 0.4)
-        self.add(queue_box)
+
+        # Add everything static in one go (grids, markers, counters, walker, queue)
+        self.add(
+            left_grid, right_grid,
+            left_start_dot, left_goal_dot, right_start_dot, right_goal_dot,
+            rw_label, bfs_label,
+            rw_dot, rw_trail,
+            queue_box,
+        )
 
         # Anim trackers and flags
         random_running = ValueTracker(1)  # 1 = running, 0 = stopped
-        rw_steps = ValueTracker(0)
-        bfs_steps = ValueTracker(0)
+        # step counters are plain ints: rw in rw_state below, BFS in the layer loop
+        bfs_steps = 0
 
         # Random walker updater: moves randomly step-by-step
         rw_state = {
             "pos": start,
             "last_move_time": 0.0,
             "step_interval": 0.25,
+            "steps": 0,
         }
 
         def rw_updater(mobj, dt):
@@ -87,20 +308,27 @@ class BFSVsRandomWalkScene(Scene):
                 return
             rw_state["last_move_time"] = 0
             x, y = rw_state["pos"]
-            neighbors = self._neighbors((x, y), maze)
-            if not neighbors:
+            mask = _nmask(x, y, padded)
+            if not mask:
                 return
-            nx, ny = random.choice(neighbors)
+            # 2 random bits pick a direction; redraw while it is blocked so every open
+            # direction stays equally likely
+            d = random.getrandbits(2)
+            while not (mask >> d) & 1:
+                d = random.getrandbits(2)
+            nx, ny = x + _DX[d], y + _DY[d]
             rw_state["pos"] = (nx, ny)
-            target = left_center_points[(nx, ny)]
+            prev = left_center_points[y, x]
+            target = left_center_points[ny, nx]
             # move dot and append to trail
             mobj.move_to(target)
             # append a small segment
-            pts = list(rw_trail.get_points())
-            pts.extend([target])
-            rw_trail.set_points_as_corners(pts)
-            rw_steps.increment_value(1)
-            rw_counter.set_value(int(rw_steps.get_value()))
+            seg = Line(prev, target, stroke_width=2, color=trail_color).set_stroke(opacity=0.7)
+            rw_trail.add(seg)
+            if len(rw_trail) > TRAIL_MAX_SEGMENTS:
+                rw_trail.remove(rw_trail[0])
+            rw_state["steps"] += 1
+            rw_counter.set_value(rw_state["steps"])
 
         rw_dot.add_updater(rw_updater)
 
@@ -111,42 +339,55 @@ class BFSVsRandomWalkScene(Scene):
         # START two processes: random walker is running via updater, BFS we animate layer-by-layer
         # We animate BFS layers sequentially while random walker uppdater runs concurrently
 
-        # Play BFS wavefront
-        for layer_index, layer in enumerate(bfs_layers):
-            # Visual effect: highlight all nodes in this layer
-            anims = []
-            for node in layer:
-                sq = right_squares[node]
-                target_color = interpolate_color(YELLOW, ORANGE, layer_index / (len(bfs_layers) or 1))
-                anims.append(sq.animate.set_fill(target_color, opacity=0.9))
-            # Enqueue visual: show items being enqueued
-            self.play(AnimationGroup(*anims, run_time=0.45))
-            # update BFS counter and the queue box
-            bfs_steps.increment_value(1)
-            bfs_counter.set_value(int(bfs_steps.get_value()))
-            # animate queue push/pop for this layer
-            self._animate_queue_push(queue_box, len(layer), self)
-
-            # Check if goal reached in this layer
-            if goal in layer:
-                # flash the goal
-                goal_sq = right_squares[goal]
-                self.play(Flash(goal_sq, color=GREEN, flash_radius=0.9))
-                # stop the random walker (freeze left side)
-                random_running.set_value(0)
-                # pause slightly to show the moment
-                self.wait(0.4)
+        # Play BFS wavefront (one precomputed color per layer):
+        # layers grown from start fade YELLOW->ORANGE, layers grown from goal TEAL->BLUE
+        n_forward = sum(1 for side, _ in bfs_layers if side == _FORWARD)
+        n_backward = len(bfs_layers) - n_forward
+        layer_colors = []
+        depth = {_FORWARD: 0, _BACKWARD: 0}
+        for side, _ in bfs_layers:
+            if side == _FORWARD:
+                layer_colors.append(interpolate_color(YELLOW, ORANGE, depth[side] / max(1, n_forward - 1)))
+            else:
+                layer_colors.append(interpolate_color(TEAL, BLUE, depth[side] / max(1, n_backward - 1)))
+            depth[side] += 1
+        for layer_index, (side, layer) in enumerate(bfs_layers):
+            # Visual effect: highlight all nodes in this layer with one grouped animation
+            layer_vg = VGroup(*(right_squares[node] for node in layer))
+            target_color = layer_colors[layer_index]
+            # queue push/pop for this layer plays in the same call as the wavefront
+            queue_anims = self._animate_queue_push(queue_box, len(layer))
+            layer_anim = AnimationGroup(layer_vg.animate.set_fill(target_color, opacity=0.9), *queue_anims, run_time=0.45, lag_ratio=0.05)
+            self.play(layer_anim)
+            # play() added the throwaway groups on top of everything; drop them so the squares
+            # draw from right_grid again (under the markers) and mobjects don't pile up
+            self.remove(layer_anim.mobject, layer_vg)
+            # update BFS counter
+            bfs_steps += 1
+            bfs_counter.set_value(bfs_steps)
+
+            # Check if the two frontiers met in this layer
+            if path and layer_index == len(bfs_layers) - 1:
+                # flash the path cell of this layer, where the frontiers touched
+                layer_cells = set(layer)
+                meet = next(p for p in path if p in layer_cells)
+                self.play(Flash(right_squares[meet], color=GREEN, flash_radius=0.9))
                 break
 
-        # Backtrack shortest path using parent dict
-        path = self._reconstruct_path(parent, start, goal)
-        # Highlight path with bold purple
-        path_anims = []
-        for p in path:
-            sq = right_squares[p]
-            path_anims.append(sq.animate.set_fill(PURPLE, opacity=1.0))
-            path_anims.append(sq.animate.set_stroke(width=3))
-        self.play(AnimationGroup(*path_anims, lag_ratio=0.08, run_time=1.2))
+        # BFS is done, whether or not it found a path: stop the random walker (freeze left side)
+        random_running.set_value(0)
+        # the walker is frozen for good: stop polling it every frame
+        rw_dot.clear_updaters()
+        if path:
+            # pause slightly to show the moment
+            self.wait(0.4)
+
+        # Highlight path with bold purple: fill and stroke share one target copy and one Transform
+        path_vg = VGroup(*(right_squares[p] for p in path))
+        path_target = path_vg.copy().set_fill(PURPLE, opacity=1.0).set_stroke(width=3)
+        self.play(Transform(path_vg, path_target), run_time=1.2)
+        # the squares keep their new style; only the temporary group (drawn above the markers) goes
+        self.remove(path_vg)
 
         # Zoom into BFS path while freezing left
         self.play(self.camera.frame.animate.scale(0.85).move_to(right_grid.get_center()))
@@ -161,8 +402,10 @@ class BFSVsRandomWalkScene(Scene):
         # Freeze left side visual: make it look messy by giving motion blur (simulate by reducing opacity)
         self.play(left_grid.animate.set_opacity(0.25), run_time=0.8)
 
-        # Fade out random walk side
-        self.play(FadeOut(left_grid), FadeOut(left_text), FadeOut(left_start_dot), FadeOut(left_goal_dot), FadeOut(rw_dot), FadeOut(rw_trail))
+        # Fade out random walk side with one grouped tween, then drop it from the scene entirely
+        left_side = VGroup(left_grid, left_text, left_start_dot, left_goal_dot, rw_dot, rw_trail)
+        self.play(left_side.animate.set_opacity(0), run_time=0.5)
+        self.remove(left_side, left_grid, left_text, left_start_dot, left_goal_dot, rw_dot, rw_trail)
         self.wait(0.3)
 
         # Keep BFS path glowing from start->purple->goal with a subtle shimmer
@@ -184,106 +427,91 @@ class BFSVsRandomWalkScene(Scene):
 
     def _build_grid(self, maze, label=""):
         n = len(maze)
-        squares = VGroup()
-        for j in range(n):
-            for i in range(n):
-                sq = Square(side_length=CELL_SIZE, stroke_width=0.5)
-                sq.move_to(np.array([(i - (n - 1)/2) * CELL_SIZE, ( (n - 1)/2 - j) * CELL_SIZE, 0]))
-                if not maze[j][i]:
-                    sq.set_fill(GREY_B, opacity=1.0).set_stroke(width=0.5, color=GREY_C)
-                else:
-                    sq.set_fill(WHITE, opacity=0.9).set_stroke(width=0.5, color=GREY_C)
-                # subtle drop shadow: duplicate with low opacity and slightly offset
-                shadow = sq.copy().set_fill(BLACK, opacity=0.06).set_stroke(width=0)
-                shadow.shift(DOWN * 0.025 + RIGHT * 0.025)
-                group = VGroup(shadow, sq)
-                group.square = sq
-                squares.add(group)
+        # All cell centers in row-major (j, i) order from one broadcast
+        xs = (np.arange(n) - (n - 1) / 2) * CELL_SIZE
+        ys = ((n - 1) / 2 - np.arange(n)) * CELL_SIZE
+        centers = np.stack(np.broadcast_arrays(xs[None, :], ys[:, None], 0), axis=-1).reshape(-1, 3)
+        fill_idx = np.where(np.asarray(maze).ravel(), 1, 0).tolist()
+        squares = VGroup(*(Square(side_length=CELL_SIZE, stroke_width=0.5).shift(c) for c in centers))
+        for sq, k in zip(squares, fill_idx):
+            color, opacity = _CELL_FILLS[k]
+            sq.set_fill(color, opacity=opacity).set_stroke(width=0.5, color=GREY_C)
+        # subtle drop shadow: every cell's offset square merged into one static VMobject
+        shadow = VMobject().set_points(_rect_points(centers + (DOWN + RIGHT) * 0.025, CELL_SIZE))
+        shadow.set_fill(BLACK, opacity=0.06).set_stroke(width=0)
         # Add label
         title = Text(label).scale(0.6)
         title.next_to(squares, UP)
-        container = VGroup(squares, title)
+        container = VGroup(shadow, squares, title)
+        container.squares = squares
+        container.n = n
         return container
 
-    def _square_dict(self, grid_vgroup):
-        # grid_vgroup[0] is squares VGroup consisting of groups of (shadow, sq)
-        squares_vg = grid_vgroup[0]
-        n = int(math.sqrt(len(squares_vg)))
-        # Build mapping from (i,j) to the actual Square (the visible one, not the shadow)
-        d = {}
-        index = 0
-        for j in range(n):
-            for i in range(n):
-                grp = squares_vg[index]
-                d[(i, j)] = grp.square
-                index += 1
-        return d
+    def _relabel_grid(self, container, label=""):
+        # swap the title of a (copied) grid built by _build_grid
+        title = Text(label).scale(0.6)
+        title.next_to(container.squares, UP)
+        container.remove(container[2])
+        container.add(title)
+        return container
 
-    def _grid_centers(self, grid_vgroup):
-        squares_vg = grid_vgroup[0]
-        n = int(math.sqrt(len(squares_vg)))
+    def _index_grid(self, grid_vgroup):
+        # Single pass filling the square map, the center map and the center array for this grid
+        key = id(grid_vgroup)
+        if key in self._squares_cache:
+            return
+        squares_vg = grid_vgroup.squares
+        n = grid_vgroup.n
+        squares = {}
         centers = {}
+        center_array = np.empty((n, n, 3))
         index = 0
         for j in range(n):
             for i in range(n):
-                grp = squares_vg[index]
-                # square is grp.square
-                centers[(i, j)] = grp.square.get_center()
+                sq = squares_vg[index]
+                c = sq.get_center()
+                squares[(i, j)] = sq
+                centers[(i, j)] = c
+                center_array[j, i] = c
                 index += 1
-        return centers
+        self._squares_cache[key] = squares
+        self._centers_cache[key] = centers
+        self._center_array_cache[key] = center_array
 
-    def _place_marker(self, grid_vgroup, coord, color=GREEN):
-        centers = self._grid_centers(grid_vgroup)
-        c = centers[coord]
-        square = Dot(c).set_color(color).scale(0.9)
-        self.add(square)
-        return square
+    def _square_dict(self, grid_vgroup):
+        self._index_grid(grid_vgroup)
+        return self._squares_cache[id(grid_vgroup)]
 
-    def _neighbors(self, node, maze):
-        x, y = node
-        n = len(maze)
-        neigh = []
-        for dx, dy in [(1,0),(-1,0),(0,1),(0,-1)]:
-            nx, ny = x + dx, y + dy
-            if 0 <= nx < n and 0 <= ny < n and maze[ny][nx]:
-                neigh.append((nx, ny))
-        return neigh
-
-    def _bfs_layers(self, maze, start, goal):
-        from collections import deque
-        n = len(maze)
-        q = deque()
-        q.append(start)
-        visited = {start}
-        parent = {start: None}
-        layers = []
-        while q:
-            layer_size = len(q)
-            layer = []
-            for _ in range(layer_size):
-                node = q.popleft()
-                layer.append(node)
-                if node == goal:
-                    layers.append(layer)
-                    return layers, parent
-                for nb in self._neighbors(node, maze):
-                    if nb not in visited:
-                        visited.add(nb)
-                        parent[nb] = node
-                        q.append(nb)
-            layers.append(layer)
-        return layers, parent
-
-    def _reconstruct_path(self, parent, start, goal):
-        if goal not in parent:
-            return []
-        path = []
-        cur = goal
-        while cur is not None:
-            path.append(cur)
-            cur = parent.get(cur, None)
-        path.reverse()
-        return path
+    def _grid_centers(self, grid_vgroup):
+        self._index_grid(grid_vgroup)
+        return self._centers_cache[id(grid_vgroup)]
+
+    def _center_array(self, grid_vgroup):
+        self._index_grid(grid_vgroup)
+        return self._center_array_cache[id(grid_vgroup)]
+
+    def _place_marker(self, grid_vgroup, coord, color=GREEN, centers=None):
+        if centers is None:
+            centers = self._grid_centers(grid_vgroup)
+        c = centers[coord]
+        # returned unadded so construct can add all markers in one call
+        return Dot(c).set_color(color).scale(0.9)
+
+    def _bfs_layers(self, padded, start, goal):
+        n = padded.shape[0] - 2
+        if HAVE_NUMBA:
+            layer_id, layer_side, path = _bfs_kernel(padded, start[0], start[1], goal[0], goal[1])
+            # Group only the cells the kernel actually expanded
+            flat_layers = [(side, []) for side in layer_side.tolist()]
+            for idx in np.flatnonzero(layer_id >= 0).tolist():
+                flat_layers[layer_id[idx]][1].append(idx)
+            path = path.tolist()
+        else:
+            maze_flat = padded[1:-1, 1:-1].tobytes()
+            flat_layers, path = _bfs_flat(maze_flat, n, start[0], start[1], goal[0], goal[1])
+        # Convert back to (x, y) only at the end
+        layers = [(side, [(idx % n, idx // n) for idx in layer]) for side, layer in flat_layers]
+        return layers, [(idx % n, idx // n) for idx in path]
 
     def _build_queue_box(self):
         box = RoundedRectangle(corner_radius=0.12, height=1.2, width=2.4)
@@ -291,21 +519,24 @@ class BFSVsRandomWalkScene(Scene):
         contents = VGroup()  # container for small squares
         contents.next_to(title, DOWN, buff=0.12)
         container = VGroup(box, title, contents)
+        # small squares reused by every push instead of allocating new ones per layer
+        container.pool = [Square(side_length=0.18).set_fill(GREY_A, opacity=0.9).set_stroke(width=0.5) for _ in range(QUEUE_SLOTS)]
         return container
 
-    def _animate_queue_push(self, queue_box, count, scene):
-        # This is a light-weight visual: create small squares that pop into the queue then fade
+    def _animate_queue_push(self, queue_box, count):
+        # This is a light-weight visual: pooled small squares pop into the queue then fade
         box = queue_box[0]
-        contents = queue_box[2]
         anims = []
-        for i in range(min(6, count)):
-            sq = Square(side_length=0.18).set_fill(GREY_A, opacity=0.9).set_stroke(width=0.5)
+        for i in range(min(QUEUE_SLOTS, count)):
+            sq = queue_box.pool[i]
             target_x = box.get_left()[0] + 0.18 * (i + 1)
             target_y = box.get_top()[1] - 0.35
             sq.move_to(np.array([target_x, target_y, 0]))
+            # the previous FadeOut leaves the square fully transparent; restore its style
+            sq.set_fill(GREY_A, opacity=0.9).set_stroke(width=0.5, opacity=1)
             anims.append(FadeIn(sq, shift=DOWN * 0.05))
             anims.append(FadeOut(sq, shift=UP * 0.05))
-        scene.play(AnimationGroup(*anims, lag_ratio=0.12, run_time=0.6))
+        return anims
 
 # Notes for running:
 # manim -pql bfs_vs_random_walk_manim.py BFSVsRandomWalkScene